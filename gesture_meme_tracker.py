@@ -6,7 +6,13 @@ Uses MediaPipe Hands to detect gestures and displays corresponding meme images
 import cv2
 import mediapipe as mp
 import numpy as np
+import csv
 import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
 
 # Initialize MediaPipe Hands and Face
 mp_hands = mp.solutions.hands
@@ -25,6 +31,35 @@ GESTURE_MEMES = {
     "none": "ok_sign.jpg"  # Default/neutral gesture
 }
 
+# Max landmark displacement (normalized coordinates) below which a frame is
+# treated as unchanged and the previous gesture is reused
+MEMO_EPSILON = 0.002
+
+# On cache hits and while the memo is bypassed, time one detect_gesture call in this many
+MEMO_COST_SAMPLE = 8
+
+# Cost samples needed (per hand count / face presence) before the memo may bypass itself
+MEMO_MIN_SAMPLES = 4
+
+# Hand landmarks read by detect_gesture (wrist, finger MCP/PIP/tips)
+HAND_GESTURE_LANDMARKS = [0, 5, 6, 8, 9, 10, 12, 13, 14, 16, 17, 18, 20]
+
+# Face mesh landmarks read by detect_gesture (lips, mouth corners, chin)
+FACE_GESTURE_LANDMARKS = [13, 14, 61, 84, 18, 175]
+
+# File extensions treated as videos in GESTURE_MEMES
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.webm')
+
+# Memory budget for decoded, display-resolution memes (LRU evicted beyond this)
+MEME_CACHE_BYTES = 64 * 1024 * 1024
+
+# Max number of meme videos kept open at once
+MAX_OPEN_VIDEOS = 4
+
+# Profiling mode: frames captured per run and stack sampling interval (seconds)
+PROFILE_FRAMES = 300
+PROFILE_SAMPLE_INTERVAL = 0.002
+
 
 def detect_gesture(hand_landmarks, all_hands=None, face_landmarks=None):
     """
@@ -281,56 +316,507 @@ def detect_gesture(hand_landmarks, all_hands=None, face_landmarks=None):
     return "none"
 
 
-def load_meme_media(images_folder):
+class GestureMemo:
     """
-    Load all meme images and videos from the specified folder.
-    
-    Args:
-        images_folder: Path to folder containing meme images/videos
-        
-    Returns:
-        Tuple of (media_dict, video_caps_dict, is_video_dict):
-        - media_dict: Images or first frame of videos
-        - video_caps_dict: VideoCapture objects for videos
-        - is_video_dict: Boolean flags indicating if media is video
+    Memoization layer in front of detect_gesture for near-static frames.
+
+    Keeps the landmarks detect_gesture reads from the last classified frame
+    and reuses its gesture while none of them has moved by epsilon or more.
+    The cache is invalidated whenever the number of hands or face presence
+    changes.
+
+    Checking landmarks is not free, and many poses classify faster than the
+    check runs. The memo keeps steady-state estimates of both costs per hand
+    count / face presence, refreshed by timing one classification in
+    MEMO_COST_SAMPLE on hits and bypassed frames. In adaptive mode it calls
+    detect_gesture directly while that is cheaper.
     """
-    meme_images = {}
-    video_caps = {}
-    is_video = {}
-    
-    for gesture, filename in GESTURE_MEMES.items():
-        media_path = os.path.join(images_folder, filename)
-        
-        # Check if it's a video file
-        if filename.endswith(('.mp4', '.avi', '.mov', '.webm')):
-            is_video[gesture] = True
-            if os.path.exists(media_path):
-                cap = cv2.VideoCapture(media_path)
-                if cap.isOpened():
-                    video_caps[gesture] = cap
-                    # Read first frame for display
+
+    def __init__(self, epsilon=MEMO_EPSILON, adaptive=True):
+        """
+        Args:
+            epsilon: Max landmark displacement (normalized units) treated as no movement
+            adaptive: Bypass the cache while classification is cheaper than checking it
+        """
+        self.epsilon = epsilon
+        self.adaptive = adaptive
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.overhead_time = 0.0  # Seconds spent on cache checks, snapshots and cost sampling
+        self._check_cost = {}     # key -> [estimated seconds per cache check, samples]
+        self._classify_cost = {}  # key -> [estimated seconds per detect_gesture, samples]
+        self._hits_by_key = {}    # key -> hits
+        self._bypass = {}         # key -> True while classifying is cheaper than checking
+        self._key = None
+        self._points = None
+        self._gesture = None
+
+    @staticmethod
+    def _tracked(hand_landmarks, all_hands, face_landmarks):
+        """List the landmarks detect_gesture depends on"""
+        hands = list(all_hands) if all_hands else []
+        if not hands or hand_landmarks is not hands[0]:
+            hands.insert(0, hand_landmarks)
+        tracked = [hand.landmark[i] for hand in hands for i in HAND_GESTURE_LANDMARKS]
+        if face_landmarks:
+            tracked.extend(face_landmarks.landmark[i] for i in FACE_GESTURE_LANDMARKS)
+        return tracked
+
+    def _unchanged(self, tracked):
+        """True if no tracked landmark moved by epsilon or more (stops at the first that did)"""
+        epsilon = self.epsilon
+        for lm, (x, y) in zip(tracked, self._points):
+            if abs(lm.x - x) >= epsilon or abs(lm.y - y) >= epsilon:
+                return False
+        return True
+
+    def _average(self, costs, key, value):
+        """Update a cost estimate and the bypass decision for key"""
+        entry = costs.get(key)
+        if entry is None:
+            costs[key] = [value, 1]
+        else:
+            estimate, samples = entry
+            if samples < MEMO_MIN_SAMPLES:
+                # Warm-up: the first call is cold (often several times slower), keep the fastest
+                estimate = min(estimate, value)
+            else:
+                # Moving average, clipping outliers (GC pauses, preemption) at twice the estimate
+                estimate += 0.1 * (min(value, 2 * estimate) - estimate)
+            entry[0] = estimate
+            entry[1] = samples + 1
+        if self.adaptive:
+            check = self._check_cost.get(key)
+            classify = self._classify_cost.get(key)
+            if (check and classify and check[1] >= MEMO_MIN_SAMPLES
+                    and classify[1] >= MEMO_MIN_SAMPLES):
+                self._bypass[key] = classify[0] <= check[0]
+
+    def _classify(self, key, hand_landmarks, all_hands, face_landmarks):
+        """Run detect_gesture and record how long it took"""
+        start = time.perf_counter()
+        gesture = detect_gesture(hand_landmarks, all_hands=all_hands, face_landmarks=face_landmarks)
+        elapsed = time.perf_counter() - start
+        self._average(self._classify_cost, key, elapsed)
+        return gesture, elapsed
+
+    def detect(self, hand_landmarks, all_hands=None, face_landmarks=None):
+        """
+        Same contract as detect_gesture, reusing the cached gesture when possible.
+
+        Returns:
+            String representing the detected gesture name
+        """
+        key = (len(all_hands) if all_hands else 0, face_landmarks is not None)
+
+        # Skip the cache while classifying this kind of frame is cheaper than checking it,
+        # timing one call in MEMO_COST_SAMPLE to notice when that stops being true
+        if self._bypass.get(key):
+            self.bypassed += 1
+            self._key = None
+            if self.bypassed % MEMO_COST_SAMPLE:
+                return detect_gesture(hand_landmarks, all_hands=all_hands, face_landmarks=face_landmarks)
+            return self._classify(key, hand_landmarks, all_hands, face_landmarks)[0]
+
+        start = time.perf_counter()
+        tracked = self._tracked(hand_landmarks, all_hands, face_landmarks)
+        if key == self._key:
+            unchanged = self._unchanged(tracked)
+            checked = time.perf_counter()
+            self._average(self._check_cost, key, checked - start)
+            if unchanged:
+                self.hits += 1
+                self._hits_by_key[key] = self._hits_by_key.get(key, 0) + 1
+                self.overhead_time += checked - start
+                if self.hits % MEMO_COST_SAMPLE == 0:
+                    # Keep the classification estimate current on held poses; the
+                    # sampled call is monitoring overhead, not time saved
+                    self._gesture, elapsed = self._classify(key, hand_landmarks, all_hands, face_landmarks)
+                    self.overhead_time += elapsed
+                return self._gesture
+
+        overhead = time.perf_counter() - start
+        gesture = self._classify(key, hand_landmarks, all_hands, face_landmarks)[0]
+        self.misses += 1
+
+        # Only update the reference on a miss so slow drift still accumulates
+        snapshot_start = time.perf_counter()
+        self._key = key
+        self._points = [(lm.x, lm.y) for lm in tracked]
+        self._gesture = gesture
+        self.overhead_time += overhead + time.perf_counter() - snapshot_start
+        return gesture
+
+    def invalidate(self):
+        """Drop the cached frame (e.g. when hands and face leave the view)"""
+        self._key = None
+        self._points = None
+        self._gesture = None
+
+    @property
+    def hit_rate(self):
+        """Fraction of frames answered from the cache"""
+        total = self.hits + self.misses + self.bypassed
+        return self.hits / total if total else 0.0
+
+    @property
+    def time_saved(self):
+        """
+        Estimated seconds saved: hits times the steady-state classification
+        cost for their hand count / face presence, minus the measured time
+        spent on cache checks, snapshots and cost sampling. Negative when the
+        cache costs more than it saves.
+        """
+        skipped = sum(hits * self._classify_cost[key][0]
+                      for key, hits in self._hits_by_key.items())
+        return skipped - self.overhead_time
+
+    def stats(self):
+        """Return a dict of hit/miss counters for logging"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hit_rate,
+            "time_saved_ms": self.time_saved * 1000,
+        }
+
+
+class MemeStore:
+    """
+    Bounded-memory meme library keyed by gesture.
+
+    The media folder is indexed once at startup without decoding anything.
+    Images (and the first frame of videos) are decoded on demand, resized to
+    display resolution and kept in an LRU cache limited to budget_bytes.
+    Video captures are opened lazily and at most max_open_videos stay open.
+    Switching to an evicted video reopens the file in the frame loop (and
+    seeks back to where it stopped), so keep max_open_videos at least as
+    large as the number of videos a session alternates between.
+    """
+
+    def __init__(self, images_folder, memes=None, budget_bytes=MEME_CACHE_BYTES,
+                 max_open_videos=MAX_OPEN_VIDEOS):
+        """
+        Args:
+            images_folder: Path to folder containing meme images/videos
+            memes: Dictionary mapping gestures to filenames (defaults to GESTURE_MEMES)
+            budget_bytes: Max bytes of decoded, display-resolution memes kept resident
+            max_open_videos: Max number of VideoCapture objects kept open
+        """
+        self.budget_bytes = budget_bytes
+        self.max_open_videos = max_open_videos
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()        # (gesture, height, max_width) -> image
+        self._video_caps = OrderedDict()   # gesture -> VideoCapture
+        self._video_positions = {}         # gesture -> frame to resume from after eviction
+
+        # Index with one directory listing per folder referenced (no decoding),
+        # so meme packs stored in subfolders cost one listing per pack
+        listings = {}
+
+        def exists(media_path):
+            folder, name = os.path.split(media_path)
+            if folder not in listings:
+                try:
+                    listings[folder] = {entry.name for entry in os.scandir(folder) if entry.is_file()}
+                except (FileNotFoundError, NotADirectoryError):
+                    listings[folder] = set()
+            return name in listings[folder]
+
+        self.paths = {}     # gesture -> media path, or None if missing
+        self.is_video = {}  # gesture -> True if media is a video
+        for gesture, filename in (memes or GESTURE_MEMES).items():
+            media_path = os.path.normpath(os.path.join(images_folder, filename))
+            self.is_video[gesture] = filename.lower().endswith(VIDEO_EXTENSIONS)
+            self.paths[gesture] = media_path if exists(media_path) else None
+
+    def _open_video(self, gesture):
+        """Return an open VideoCapture for gesture, or None if it can't be opened"""
+        cap = self._video_caps.get(gesture)
+        if cap is not None:
+            self._video_caps.move_to_end(gesture)
+            return cap
+
+        path = self.paths.get(gesture)
+        if path is None:
+            return None
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            # Corrupt or unsupported: forget the path so later calls use the placeholder
+            self.paths[gesture] = None
+            return None
+
+        # Resume playback where it was when this capture was evicted
+        position = self._video_positions.pop(gesture, 0)
+        if position:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+
+        self._video_caps[gesture] = cap
+        while len(self._video_caps) > self.max_open_videos:
+            old_gesture, old_cap = self._video_caps.popitem(last=False)
+            self._video_positions[old_gesture] = old_cap.get(cv2.CAP_PROP_POS_FRAMES)
+            old_cap.release()
+        return cap
+
+    def _decode(self, gesture):
+        """Decode the full-resolution still for gesture (placeholder if missing)"""
+        path = self.paths.get(gesture)
+        if path is not None:
+            if self.is_video[gesture]:
+                cap = self._open_video(gesture)
+                if cap is not None:
+                    # Read first frame, then rewind so playback starts at the beginning
                     ret, frame = cap.read()
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
                     if ret:
-                        meme_images[gesture] = frame
-                    else:
-                        meme_images[gesture] = create_placeholder_image(gesture)
-                else:
-                    meme_images[gesture] = create_placeholder_image(gesture)
+                        return frame
             else:
-                meme_images[gesture] = create_placeholder_image(gesture)
-        else:
-            # It's an image file
-            is_video[gesture] = False
-            if os.path.exists(media_path):
-                img = cv2.imread(media_path)
+                img = cv2.imread(path)
                 if img is not None:
-                    meme_images[gesture] = img
-                else:
-                    meme_images[gesture] = create_placeholder_image(gesture)
-            else:
-                meme_images[gesture] = create_placeholder_image(gesture)
+                    return img
+        return create_placeholder_image(gesture)
+
+    def _fit(self, image, target_height, max_width):
+        """Resize image to target_height, squashing it if wider than max_width"""
+        resized = resize_meme(image, target_height)
+        if max_width is not None and resized.shape[1] > max_width:
+            resized = cv2.resize(resized, (max_width, target_height))
+        return resized
+
+    def _still(self, gesture, target_height, max_width):
+        """Return the cached display-resolution still, decoding it on a miss"""
+        key = (gesture, target_height, max_width)
+        image = self._cache.get(key)
+        if image is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = self._fit(self._decode(gesture), target_height, max_width)
+        self._cache[key] = image
+        self.resident_bytes += image.nbytes
+
+        # Evict least recently used entries, always keeping the newest one
+        while self.resident_bytes > self.budget_bytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self.resident_bytes -= evicted.nbytes
+        return image
+
+    def get(self, gesture, target_height, max_width=None):
+        """
+        Get the meme to display for gesture, sized for the output window.
+
+        Videos advance by one frame per call and loop at the end; images come
+        from the LRU cache. Unknown gestures fall back to "none", or to a
+        placeholder when the library has no "none" entry.
+
+        Args:
+            gesture: Gesture name
+            target_height: Desired height in pixels
+            max_width: Optional maximum width in pixels
+
+        Returns:
+            Resized image
+        """
+        if gesture not in self.paths and "none" in self.paths:
+            gesture = "none"
+
+        # Gestures without any media entry fall through to their placeholder
+        if self.is_video.get(gesture) and self.paths[gesture] is not None:
+            cap = self._open_video(gesture)
+            if cap is not None:
+                ret, frame = cap.read()
+                if not ret:
+                    # Loop video from beginning
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    ret, frame = cap.read()
+                if ret:
+                    return self._fit(frame, target_height, max_width)
+
+        return self._still(gesture, target_height, max_width)
+
+    def stats(self):
+        """Return a dict of cache counters for logging"""
+        return {
+            "entries": len(self._cache),
+            "resident_bytes": self.resident_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "open_videos": len(self._video_caps),
+        }
+
+    def release(self):
+        """Release open video captures and drop cached images"""
+        for cap in self._video_caps.values():
+            if cap.isOpened():
+                cap.release()
+        self._video_caps.clear()
+        self._video_positions.clear()
+        self._cache.clear()
+        self.resident_bytes = 0
+
+
+class FrameProfiler:
+    """
+    Time-bounded profiler for the tracking loop.
+
+    Once triggered, a background thread samples the main thread's Python stack
+    every PROFILE_SAMPLE_INTERVAL seconds while the loop records per-section
+    timings for the next num_frames frames. The result is written as a
+    collapsed-stack file (for flamegraph.pl / speedscope) and a per-frame CSV.
+
+    The sampler only runs when it gets the GIL, so samples arrive less often
+    while the main thread runs Python code than while it waits in C. Each
+    sample is therefore weighted by the wall time since the previous one, and
+    the weights in the collapsed file are microseconds, not sample counts.
+    The interpreter's switch interval is lowered to the sampling interval
+    for the length of a capture to keep that attribution fine-grained.
+    """
+
+    def __init__(self, output_dir, num_frames=PROFILE_FRAMES, interval=PROFILE_SAMPLE_INTERVAL):
+        """
+        Args:
+            output_dir: Folder where profile files are written
+            num_frames: Number of frames captured per profiling run
+            interval: Seconds between stack samples
+        """
+        self.output_dir = output_dir
+        self.num_frames = num_frames
+        self.interval = interval
+        self.active = False
+        self._requested = False
+        self._thread_id = threading.get_ident()
+        self._stop_event = threading.Event()
+        self._sampler = None
+        self._switch_interval = None
+        self._stacks = Counter()  # collapsed stack -> microseconds
+        self._rows = []
+        self._sections = []
+        self._frame_start = 0.0
+        self._last = 0.0
+        self._laps = {}
+
+    def request(self, *_):
+        """Ask for a capture to start on the next frame (safe to use as a signal handler)"""
+        # Requests made while a capture is running are ignored
+        if not self.active:
+            self._requested = True
+
+    def start(self):
+        """Start sampling immediately (e.g. to include startup in the capture)"""
+        self._requested = False
+        if self.active:
+            return
+        self.active = True
+        self._stacks = Counter()
+        self._rows = []
+        self._sections = []
+        self._stop_event.clear()
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+        print(f"\nProfiling next {self.num_frames} frames...")
+
+    def _sample(self):
+        """Sampler thread: record the main thread's stack until stopped"""
+        last = time.perf_counter()
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            # Charge the wall time since the previous sample to the current stack
+            now = time.perf_counter()
+            elapsed_us = int(round((now - last) * 1e6))
+            last = now
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self._stacks[";".join(reversed(stack))] += elapsed_us
+
+    def begin_frame(self):
+        """Mark the start of a loop iteration"""
+        if self._requested:
+            self.start()
+        if self.active:
+            self._frame_start = self._last = time.perf_counter()
+            self._laps = {}
+
+    def lap(self, section):
+        """Charge the time since the previous mark to section"""
+        if self.active:
+            now = time.perf_counter()
+            if section not in self._sections:
+                self._sections.append(section)
+            self._laps[section] = self._laps.get(section, 0.0) + (now - self._last) * 1000
+            self._last = now
+
+    def end_frame(self):
+        """Mark the end of a loop iteration, writing results after num_frames"""
+        if not self.active:
+            return
+        total_ms = (time.perf_counter() - self._frame_start) * 1000
+        self._rows.append((total_ms, self._laps))
+        if len(self._rows) >= self.num_frames:
+            self.stop()
+
+    def stop(self):
+        """Stop sampling and write whatever has been captured"""
+        if not self.active:
+            return
+        self.active = False
+        self._stop_event.set()
+        self._sampler.join()
+        sys.setswitchinterval(self._switch_interval)
+        self._write()
+
+    def _write(self):
+        """Write the collapsed stacks and per-frame timing CSV"""
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        # Millisecond timestamp plus a counter so back-to-back captures never collide
+        now = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"-{int(now * 1000) % 1000:03d}"
+        base = os.path.join(self.output_dir, f"profile-{stamp}")
+        suffix = 1
+        while os.path.exists(base + ".collapsed"):
+            base = os.path.join(self.output_dir, f"profile-{stamp}-{suffix}")
+            suffix += 1
+
+        with open(base + ".collapsed", "w") as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        with open(base + "-frames.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "total_ms"] + [f"{name}_ms" for name in self._sections])
+            for i, (total_ms, laps) in enumerate(self._rows):
+                writer.writerow([i, f"{total_ms:.3f}"] +
+                                [f"{laps.get(name, 0.0):.3f}" for name in self._sections])
+
+        print(f"Profile written: {base}.collapsed (weights in microseconds), {base}-frames.csv")
+
+
+def load_meme_media(images_folder, budget_bytes=MEME_CACHE_BYTES):
+    """
+    Index the meme images and videos in the specified folder.
+    
+    Nothing is decoded here; media is loaded on demand by the returned store.
     
-    return meme_images, video_caps, is_video
+    Args:
+        images_folder: Path to folder containing meme images/videos
+        budget_bytes: Max bytes of decoded memes kept in memory
+        
+    Returns:
+        MemeStore serving display-resolution memes for each gesture
+    """
+    return MemeStore(images_folder, budget_bytes=budget_bytes)
 
 
 def create_placeholder_image(gesture_name):
@@ -397,7 +883,7 @@ def main():
     """
     print("=" * 60)
     print("Gesture Meme Tracker - Clash Royale Edition")
-    print("Press 'q' to quit")
+    print("Press 'q' to quit, 'p' to capture a profile")
     print("=" * 60)
     print("\nCustom Gestures:")
     print("😂 JIJIJA - Just laugh (mouth open)")
@@ -420,8 +906,16 @@ def main():
         print("Expected filenames:", list(GESTURE_MEMES.values()))
         print()
     
-    # Load meme images and videos
-    meme_images, video_caps, is_video = load_meme_media(images_folder)
+    # Profiling mode: 'p' key or SIGUSR1 captures the next PROFILE_FRAMES frames,
+    # GESTURE_MEME_PROFILE=1 starts capturing at launch (includes meme loading)
+    profiler = FrameProfiler(os.path.join(os.path.dirname(__file__), "profiles"))
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, profiler.request)
+    if os.environ.get("GESTURE_MEME_PROFILE", "").strip().lower() in ("1", "true", "yes", "on"):
+        profiler.start()
+    
+    # Index meme images and videos (decoded lazily)
+    meme_store = load_meme_media(images_folder)
     
     # Initialize webcam
     cap = cv2.VideoCapture(0)
@@ -429,6 +923,8 @@ def main():
     # Check if webcam opened successfully
     if not cap.isOpened():
         print("Error: Could not open webcam!")
+        profiler.stop()
+        meme_store.release()
         return
     
     # Set camera resolution (optional, adjust as needed)
@@ -450,8 +946,11 @@ def main():
     ) as face_mesh:
         
         current_gesture = "none"
+        gesture_memo = GestureMemo()
         
         while True:
+            profiler.begin_frame()
+            
             # Read frame from webcam
             success, frame = cap.read()
             
@@ -467,10 +966,13 @@ def main():
             
             # Convert BGR to RGB (MediaPipe uses RGB)
             rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            profiler.lap("capture")
             
             # Process the frame with MediaPipe Hands and Face
             hand_results = hands.process(rgb_frame)
+            profiler.lap("hands")
             face_results = face_mesh.process(rgb_frame)
+            profiler.lap("face")
             
             # Check if face detected and draw landmarks
             face_landmarks = None
@@ -484,6 +986,7 @@ def main():
                     None,
                     mp_drawing.DrawingSpec(color=(80, 256, 121), thickness=1, circle_radius=1)
                 )
+            profiler.lap("draw")
             
             # Check if hand(s) detected
             if hand_results.multi_hand_landmarks:
@@ -497,8 +1000,10 @@ def main():
                         mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2)
                     )
                 
+                profiler.lap("draw")
+                
                 # Detect gesture (pass all hands and face for multi-hand gestures)
-                current_gesture = detect_gesture(
+                current_gesture = gesture_memo.detect(
                     hand_results.multi_hand_landmarks[0],
                     all_hands=hand_results.multi_hand_landmarks,
                     face_landmarks=face_landmarks
@@ -507,7 +1012,7 @@ def main():
                 # No hands detected but face is visible - check for face-only gestures like JIJIJA
                 # Create a dummy hand landmark for the function call
                 dummy_landmarks = type('obj', (object,), {'landmark': [type('obj', (object,), {'x': 0, 'y': 0})] * 21})()
-                current_gesture = detect_gesture(
+                current_gesture = gesture_memo.detect(
                     dummy_landmarks,
                     all_hands=None,
                     face_landmarks=face_landmarks
@@ -515,30 +1020,13 @@ def main():
             else:
                 # No hands or face detected, reset to neutral
                 current_gesture = "none"
+                gesture_memo.invalidate()
+            profiler.lap("detect")
             
-            # Get appropriate meme for current gesture
-            # If it's a video, read the next frame
-            if is_video.get(current_gesture, False) and current_gesture in video_caps:
-                ret, video_frame = video_caps[current_gesture].read()
-                if ret:
-                    meme_images[current_gesture] = video_frame
-                else:
-                    # Loop video from beginning
-                    video_caps[current_gesture].set(cv2.CAP_PROP_POS_FRAMES, 0)
-                    ret, video_frame = video_caps[current_gesture].read()
-                    if ret:
-                        meme_images[current_gesture] = video_frame
-            
-            meme = meme_images.get(current_gesture, meme_images["none"])
-            
-            # Resize meme to match frame height
-            meme_resized = resize_meme(meme, frame_height)
-            
-            # Ensure meme width doesn't exceed reasonable size
-            meme_height, meme_width = meme_resized.shape[:2]
-            if meme_width > frame_width:
-                meme_resized = cv2.resize(meme_resized, (frame_width, frame_height))
-                meme_width = frame_width
+            # Get meme for current gesture at display size (videos advance one frame)
+            meme_resized = meme_store.get(current_gesture, frame_height, frame_width)
+            meme_width = meme_resized.shape[1]
+            profiler.lap("meme")
             
             # Create combined display (webcam + meme side by side)
             combined_width = frame_width + meme_width
@@ -606,25 +1094,42 @@ def main():
                            0.5, (0, 255, 255), 1, cv2.LINE_AA)
             
             # Add instructions
-            cv2.putText(combined_frame, "Press 'q' to quit", 
+            cv2.putText(combined_frame, "Press 'q' to quit, 'p' to profile", 
                        (10, frame_height - 10), cv2.FONT_HERSHEY_SIMPLEX, 
                        0.6, (255, 255, 255), 1, cv2.LINE_AA)
+            profiler.lap("render")
             
             # Display the combined frame
             cv2.imshow('Gesture Meme Tracker', combined_frame)
             
-            # Check for 'q' key press to quit
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            # Check for 'q' key press to quit, 'p' to start a profile capture
+            key = cv2.waitKey(1) & 0xFF
+            profiler.lap("display")
+            profiler.end_frame()
+            if key == ord('p'):
+                profiler.request()
+            elif key == ord('q'):
                 print("\nQuitting Gesture Meme Tracker...")
                 break
     
+    # Flush a capture that was still running when the loop ended
+    profiler.stop()
+    
+    # Report how often near-static frames skipped classification
+    memo_stats = gesture_memo.stats()
+    print(f"Gesture cache: {memo_stats['hits']} hits, {memo_stats['misses']} misses, "
+          f"{memo_stats['bypassed']} bypassed "
+          f"({memo_stats['hit_rate']:.0%} hit rate, ~{memo_stats['time_saved_ms']:.1f} ms saved)")
+    
     # Release resources
     cap.release()
     
+    store_stats = meme_store.stats()
+    print(f"Meme cache: {store_stats['entries']} entries, {store_stats['resident_bytes'] / 1e6:.1f} MB resident, "
+          f"{store_stats['hits']} hits, {store_stats['misses']} misses")
+    
     # Release all video captures
-    for video_cap in video_caps.values():
-        if video_cap.isOpened():
-            video_cap.release()
+    meme_store.release()
     
     cv2.destroyAllWindows()
     print("Application closed successfully!")
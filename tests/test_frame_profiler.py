@@ -0,0 +1,93 @@
+"""
+Tests for FrameProfiler capture lifecycle and output files.
+"""
+
+import csv
+import sys
+import time
+
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+
+from gesture_meme_tracker import FrameProfiler  # noqa: E402
+
+
+def run_frames(profiler, count):
+    for _ in range(count):
+        profiler.begin_frame()
+        profiler.lap("work")
+        profiler.end_frame()
+
+
+def test_capture_writes_collapsed_stacks_and_frame_csv(tmp_path):
+    profiler = FrameProfiler(str(tmp_path), num_frames=5)
+    profiler.request()
+    run_frames(profiler, 8)
+
+    assert not profiler.active
+    [frames_csv] = tmp_path.glob("*-frames.csv")
+    assert len(list(tmp_path.glob("*.collapsed"))) == 1
+    with open(frames_csv) as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["frame", "total_ms", "work_ms"]
+    assert len(rows) == 6
+
+
+def test_request_during_capture_is_ignored(tmp_path):
+    profiler = FrameProfiler(str(tmp_path), num_frames=3)
+    profiler.request()
+    run_frames(profiler, 1)
+    profiler.request()
+    run_frames(profiler, 4)
+
+    assert not profiler.active
+    assert len(list(tmp_path.glob("*.collapsed"))) == 1
+
+
+def test_back_to_back_captures_do_not_overwrite(tmp_path):
+    profiler = FrameProfiler(str(tmp_path), num_frames=1)
+    for _ in range(3):
+        profiler.request()
+        run_frames(profiler, 1)
+
+    assert len(list(tmp_path.glob("*.collapsed"))) == 3
+    assert len(list(tmp_path.glob("*-frames.csv"))) == 3
+
+
+def busy_python(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+
+def test_stack_weights_are_wall_time_microseconds(tmp_path):
+    profiler = FrameProfiler(str(tmp_path), num_frames=1)
+    profiler.start()
+    start = time.perf_counter()
+    busy_python(0.3)
+    elapsed_us = (time.perf_counter() - start) * 1e6
+    profiler.stop()
+
+    [collapsed] = tmp_path.glob("*.collapsed")
+    weights = {}
+    for line in collapsed.read_text().splitlines():
+        stack, weight = line.rsplit(" ", 1)
+        weights[stack] = int(weight)
+    busy_us = sum(weight for stack, weight in weights.items() if "busy_python" in stack)
+
+    # Unweighted counts would stay far below this while Python holds the GIL
+    assert busy_us > 0.7 * elapsed_us
+    assert sum(weights.values()) < 1.3 * elapsed_us
+
+
+def test_switch_interval_restored_after_capture(tmp_path):
+    before = sys.getswitchinterval()
+    profiler = FrameProfiler(str(tmp_path), num_frames=1, interval=0.001)
+    profiler.start()
+    assert sys.getswitchinterval() == pytest.approx(0.001)
+    profiler.stop()
+    assert sys.getswitchinterval() == before
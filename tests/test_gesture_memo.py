@@ -0,0 +1,213 @@
+"""
+Replay tests for GestureMemo: memoized labels must match detect_gesture.
+"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+
+import gesture_meme_tracker  # noqa: E402
+from gesture_meme_tracker import MEMO_COST_SAMPLE, MEMO_EPSILON, GestureMemo, detect_gesture  # noqa: E402
+
+# (MCP, PIP, tip) landmark indices for index, middle, ring and pinky
+FINGERS = [(5, 6, 8), (9, 10, 12), (13, 14, 16), (17, 18, 20)]
+
+
+def make_hand(wrist_x, wrist_y, extended):
+    """Build 21 hand landmarks with the given fingers extended (clear margins)"""
+    points = [(wrist_x, wrist_y)] * 21
+    for finger, (mcp, pip, tip) in enumerate(FINGERS):
+        x = wrist_x - 0.03 + 0.02 * finger
+        points[mcp] = (x, wrist_y - 0.05)
+        if finger in extended:
+            points[pip] = (x, wrist_y - 0.10)
+            points[tip] = (x, wrist_y - 0.15)
+        else:
+            points[pip] = (x, wrist_y - 0.08)
+            points[tip] = (x, wrist_y - 0.03)
+    return points
+
+
+def make_face(mouth_open):
+    """Build face mesh landmarks with the mouth open or closed and the chin at (0.5, 0.62)"""
+    points = [(0.5, 0.5)] * 200
+    points[13] = (0.5, 0.55)
+    points[14] = (0.5, 0.58 if mouth_open else 0.55)
+    points[61] = (0.46, 0.56)
+    points[84] = (0.54, 0.56)
+    points[18] = (0.5, 0.62)
+    points[175] = (0.5, 0.64)
+    return points
+
+
+def to_landmarks(points, jitter, rng):
+    """Wrap (x, y) points in a MediaPipe-like landmarks object with sensor jitter"""
+    return SimpleNamespace(landmark=[
+        SimpleNamespace(x=x + rng.uniform(-jitter, jitter), y=y + rng.uniform(-jitter, jitter))
+        for x, y in points
+    ])
+
+
+# (expected gesture, hand poses, face pose or None)
+SCENES = [
+    ("cerrao", [make_hand(0.5, 0.8, {0})], None),
+    ("peace", [make_hand(0.5, 0.8, {0, 1})], None),
+    ("none", [make_hand(0.5, 0.8, {0, 1, 2, 3})], None),
+    ("thinking", [make_hand(0.53, 0.78, {0})], make_face(mouth_open=False)),
+    ("jijija", [make_hand(0.5, 0.8, {0, 1, 2, 3})], make_face(mouth_open=True)),
+    ("mimimi", [make_hand(0.3, 0.8, set()), make_hand(0.7, 0.8, set())], None),
+    ("sixseven", [make_hand(0.2, 0.8, {0, 1, 2}), make_hand(0.8, 0.8, {0, 1, 2})], None),
+    ("timeout", [make_hand(0.45, 0.8, {0, 1, 2, 3}), make_hand(0.55, 0.8, {0, 1, 2, 3})], None),
+]
+
+
+def replay(memo, scenes, frames_per_scene=30, jitter=MEMO_EPSILON / 4, seed=0):
+    """Replay held poses through memo and detect_gesture, returning both label lists"""
+    rng = random.Random(seed)
+    memo_labels, plain_labels = [], []
+    for _, hand_poses, face_pose in scenes:
+        for _ in range(frames_per_scene):
+            hands = [to_landmarks(pose, jitter, rng) for pose in hand_poses]
+            face = to_landmarks(face_pose, jitter, rng) if face_pose else None
+            memo_labels.append(memo.detect(hands[0], all_hands=hands, face_landmarks=face))
+            plain_labels.append(detect_gesture(hands[0], all_hands=hands, face_landmarks=face))
+    return memo_labels, plain_labels
+
+
+@pytest.mark.parametrize("adaptive", [False, True])
+def test_replay_labels_match_unmemoized(adaptive):
+    memo = GestureMemo(adaptive=adaptive)
+    memo_labels, plain_labels = replay(memo, SCENES)
+
+    assert memo_labels == plain_labels
+    assert plain_labels[::30] == [expected for expected, _, _ in SCENES]
+    if not adaptive:
+        assert memo.hits > memo.misses
+
+
+def test_shuffled_replay_labels_match_unmemoized():
+    scenes = SCENES * 3
+    random.Random(1).shuffle(scenes)
+    memo_labels, plain_labels = replay(GestureMemo(adaptive=False), scenes, frames_per_scene=10)
+
+    assert memo_labels == plain_labels
+
+
+def test_face_presence_change_invalidates():
+    memo = GestureMemo(adaptive=False)
+    rng = random.Random(0)
+    hand = to_landmarks(make_hand(0.5, 0.8, {0, 1, 2, 3}), 0, rng)
+    face = to_landmarks(make_face(mouth_open=True), 0, rng)
+
+    assert memo.detect(hand, all_hands=[hand]) == "none"
+    assert memo.detect(hand, all_hands=[hand]) == "none"
+    assert memo.detect(hand, all_hands=[hand], face_landmarks=face) == "jijija"
+    assert memo.detect(hand, all_hands=[hand]) == "none"
+    assert (memo.hits, memo.misses) == (1, 3)
+
+
+def test_hand_count_change_invalidates():
+    memo = GestureMemo(adaptive=False)
+    rng = random.Random(0)
+    left = to_landmarks(make_hand(0.3, 0.8, set()), 0, rng)
+    right = to_landmarks(make_hand(0.7, 0.8, set()), 0, rng)
+
+    assert memo.detect(left, all_hands=[left]) == "none"
+    assert memo.detect(left, all_hands=[left, right]) == "mimimi"
+    assert memo.detect(left, all_hands=[left]) == "none"
+    assert (memo.hits, memo.misses) == (0, 3)
+
+
+def test_invalidate_and_movement_force_reclassification():
+    memo = GestureMemo(adaptive=False)
+    rng = random.Random(0)
+    hand = to_landmarks(make_hand(0.5, 0.8, {0}), 0, rng)
+    moved = to_landmarks(make_hand(0.5 + 2 * MEMO_EPSILON, 0.8, {0}), 0, rng)
+
+    memo.detect(hand, all_hands=[hand])
+    memo.detect(hand, all_hands=[hand])
+    memo.invalidate()
+    memo.detect(hand, all_hands=[hand])
+    memo.detect(moved, all_hands=[moved])
+    assert (memo.hits, memo.misses) == (1, 3)
+
+
+class FakeClock:
+    """Deterministic perf_counter that only advances when told to"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+def run_with_costs(monkeypatch, classify_costs, check_cost, frames=200, adaptive=True):
+    """
+    Hold one pose for frames frames with detect_gesture and the cache check
+    costing fixed amounts of fake time (classify_costs[-1] repeats).
+    """
+    clock = FakeClock()
+    monkeypatch.setattr(gesture_meme_tracker, "time", clock)
+
+    costs = iter(classify_costs)
+    last = [classify_costs[-1]]
+
+    def timed_detect_gesture(*args, **kwargs):
+        last[0] = next(costs, last[0])
+        clock.now += last[0]
+        return detect_gesture(*args, **kwargs)
+
+    monkeypatch.setattr(gesture_meme_tracker, "detect_gesture", timed_detect_gesture)
+
+    memo = GestureMemo(adaptive=adaptive)
+    unchanged = memo._unchanged
+
+    def timed_unchanged(tracked):
+        clock.now += check_cost
+        return unchanged(tracked)
+
+    monkeypatch.setattr(memo, "_unchanged", timed_unchanged)
+
+    hand = to_landmarks(make_hand(0.53, 0.78, {0}), 0, random.Random(0))
+    face = to_landmarks(make_face(mouth_open=False), 0, random.Random(0))
+    labels = {memo.detect(hand, all_hands=[hand], face_landmarks=face) for _ in range(frames)}
+    assert labels == {"thinking"}
+    return memo
+
+
+def test_cold_first_call_does_not_keep_a_slower_cache(monkeypatch):
+    # First call is cold (20 us), steady state is 3 us, a cache check costs 5 us
+    memo = run_with_costs(monkeypatch, [20e-6, 3e-6], check_cost=5e-6)
+
+    assert memo.bypassed > 150
+    assert memo.time_saved < 0
+
+
+def test_expensive_classification_keeps_the_cache(monkeypatch):
+    memo = run_with_costs(monkeypatch, [30e-6], check_cost=5e-6)
+
+    assert memo.bypassed == 0
+    assert memo.hits == 199
+    # Each hit skips 30 us for a 5 us check; one hit in MEMO_COST_SAMPLE also pays 30 us sampling
+    expected = 199 * (30e-6 - 5e-6) - (199 // MEMO_COST_SAMPLE) * 30e-6
+    assert memo.time_saved == pytest.approx(expected)
+
+
+def test_cache_resumes_when_classification_gets_expensive(monkeypatch):
+    # Cheap at first, then the same kind of frame becomes expensive to classify
+    memo = run_with_costs(monkeypatch, [3e-6] * 40 + [30e-6], check_cost=5e-6, frames=600)
+
+    assert memo.bypassed > 0
+    assert memo.hits > 300
+
+
+def test_non_adaptive_memo_reports_net_loss(monkeypatch):
+    memo = run_with_costs(monkeypatch, [20e-6, 3e-6], check_cost=5e-6, adaptive=False)
+
+    assert memo.bypassed == 0
+    assert memo.time_saved < 0
@@ -0,0 +1,89 @@
+"""
+Tests for MemeStore indexing and fallbacks.
+"""
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+
+import numpy as np  # noqa: E402
+
+from gesture_meme_tracker import MemeStore  # noqa: E402
+
+
+def write_image(path, width=200, height=100):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cv2.imwrite(str(path), np.full((height, width, 3), 127, dtype=np.uint8))
+
+
+def test_indexes_media_in_subfolders(tmp_path):
+    write_image(tmp_path / "pack" / "peace.jpg")
+    store = MemeStore(str(tmp_path), memes={"peace": "pack/peace.jpg", "none": "pack/missing.jpg"})
+
+    assert store.paths["peace"] == str(tmp_path / "pack" / "peace.jpg")
+    assert store.paths["none"] is None
+    assert store.get("peace", 50).shape == (50, 100, 3)
+
+
+def test_unknown_gesture_without_none_entry_gets_placeholder(tmp_path):
+    store = MemeStore(str(tmp_path), memes={"peace": "peace.jpg"})
+
+    assert store.get("bogus", 60, 80).shape == (60, 60, 3)
+
+
+def test_lru_stays_within_budget(tmp_path):
+    memes = {}
+    for i in range(5):
+        write_image(tmp_path / f"{i}.jpg")
+        memes[str(i)] = f"{i}.jpg"
+    store = MemeStore(str(tmp_path), memes=memes, budget_bytes=2 * 100 * 200 * 3)
+
+    for gesture in memes:
+        store.get(gesture, 100)
+    store.get("4", 100)
+
+    stats = store.stats()
+    assert stats["resident_bytes"] <= store.budget_bytes
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (2, 1, 5)
+
+
+def write_video(path, frames=20):
+    """Write an MJPG video whose frame i is filled with gray level 10 * i"""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(frames):
+        writer.write(np.full((48, 64, 3), 10 * i, dtype=np.uint8))
+    writer.release()
+
+
+def test_unopenable_video_is_tried_once(tmp_path, monkeypatch):
+    (tmp_path / "broken.mp4").write_bytes(b"not a video")
+    opened = []
+    video_capture = cv2.VideoCapture
+
+    def counting_video_capture(path):
+        opened.append(path)
+        return video_capture(path)
+
+    monkeypatch.setattr(cv2, "VideoCapture", counting_video_capture)
+    store = MemeStore(str(tmp_path), memes={"none": "broken.mp4"})
+
+    for _ in range(10):
+        assert store.get("none", 60).shape == (60, 60, 3)
+    assert len(opened) == 1
+    assert store.paths["none"] is None
+
+
+def test_evicted_video_resumes_playback(tmp_path):
+    write_video(tmp_path / "a.avi")
+    write_video(tmp_path / "b.avi")
+    store = MemeStore(str(tmp_path), memes={"a": "a.avi", "b": "b.avi", "none": "a.avi"},
+                      max_open_videos=1)
+
+    for _ in range(5):
+        store.get("a", 48)
+    store.get("b", 48)
+    frame = store.get("a", 48)
+
+    assert store.stats()["open_videos"] == 1
+    assert abs(float(frame.mean()) - 50) < 5